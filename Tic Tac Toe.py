@@ -3,25 +3,80 @@ import random
 import math # Import math for infinity values in Minimax
 import time # Import time for delays
 import platform
+import sys
 import smtplib
 import csv
+import pickle
+import io
+import atexit
+import re
+import functools
+import queue
+import threading
+from collections import deque, namedtuple
 from email.message import EmailMessage
+from itertools import islice
+from operator import attrgetter
 
 # --- ANSI escape codes for colors (for board and Elo tiers) ---
 COLOR_RED = "\033[31m"
 COLOR_BLUE = "\033[34m"
 COLOR_RESET = "\033[0m" # Resets the color back to default
 
+# --- Pacing delays ---
+# Seconds to pause after each AI move (and to drive the loading animation) so a
+# person can follow along. Set TTT_AI_DELAY to override; defaults to no delay
+# when output is not a terminal, e.g. for scripted self-play.
+def _delay_from_env():
+    """Reads TTT_AI_DELAY, falling back to the default if it is not a usable number of seconds."""
+    default = 1.0 if sys.stdout.isatty() else 0.0
+    try:
+        delay = float(os.environ.get("TTT_AI_DELAY", default))
+    except ValueError:
+        return default # A typo should not stop the game from starting
+    return max(0.0, delay) if math.isfinite(delay) else default # time.sleep rejects negative and infinite values
+
+AI_MOVE_DELAY = _delay_from_env()
+
+# --- Line editing for prompts ---
+# readline gives input() history and Tab completion; it is missing on plain Windows installs
+try:
+    import readline
+except ImportError:
+    readline = None
+
 # --- Safe beep wrapper for platform compatibility ---
+# The platform check and winsound import happen once, at import time
+_BEEP = None
+if platform.system() == "Windows":
+    try:
+        import winsound
+        _BEEP = winsound.Beep
+    except ImportError:
+        pass # winsound not available
+
+# winsound.Beep blocks for the whole duration, so beeps are played by a
+# background thread and the menus return straight away
+_beep_queue = None
+if _BEEP is not None:
+    _beep_queue = queue.Queue()
+
+    def _beep_worker():
+        """Plays queued (frequency, duration) beeps one after another."""
+        while True:
+            frequency, duration = _beep_queue.get()
+            try:
+                _BEEP(frequency, duration)
+            except RuntimeError:
+                pass # No sound device; keep serving later beeps
+
+    threading.Thread(target=_beep_worker, name="beep", daemon=True).start()
+
 def safe_beep(frequency=1000, duration=200):
     """Plays a system beep, safely handling different operating systems."""
-    if platform.system() == "Windows":
-        try:
-            import winsound
-            winsound.Beep(frequency, duration)
-        except ImportError:
-            pass # winsound not available
-    # No-op for other operating systems or if winsound fails
+    if _beep_queue is not None:
+        _beep_queue.put((frequency, duration))
+    # No-op for other operating systems or if winsound is unavailable
 
 # --- Elo Rating System Components ---
 
@@ -31,181 +86,252 @@ def color_text(text, color_code):
 
 def get_level(rating):
     """Calculates a player's level based on their rating."""
+    return _get_level_cached(int(rating))
+
+@functools.lru_cache(maxsize=10000)
+def _get_level_cached(rating):
+    """Cached level label keyed by the integer rating."""
     return f"Level {int(rating ** 0.5)}"
 
 class Player:
     """Represents a player with an Elo rating."""
+    __slots__ = ("name", "rating", "tier_index", "k_factor", "old_names") # No per-instance __dict__
+
     def __init__(self, name, rating=1200, k_factor=30): # Adjusted default rating for new players
         self.name = name
         self.rating = rating
+        self.tier_index = _tier_index(rating) # Cached; kept current by set_rating
         self.k_factor = k_factor
         self.old_names = []  # track previous names (optional)
 
     def __str__(self):
         """Returns a string representation of the player with their rating, tier, and progress bar."""
-        tier = get_tier(self.rating)
-        level = get_level(self.rating)
-        progress = get_progress_bar(self.rating)
+        tier, level, progress = _decorate(self.rating)
         return f"{self.name}: {round(self.rating)} ({tier}, {level}) [K={self.k_factor}] {progress}"
 
+def set_rating(player, rating, tier_counts):
+    """Changes a player's rating, working out their tier once here instead of on every view."""
+    tier_index = _tier_index(rating)
+    if tier_index != player.tier_index: # Move the player to their new histogram bin
+        tier_counts[player.tier_index] -= 1
+        tier_counts[tier_index] += 1
+        player.tier_index = tier_index
+    player.rating = rating
+
+# Tier bands are 500 rating points wide, so a rating's tier index is a single
+# integer division; everything from 5000 upwards is the last tier.
+TIER_WIDTH = 500
+TOP_TIER_INDEX = 10
+TIER_NAMES = (
+    "Noob 🐣",
+    "Beginner 🧑‍🎓",
+    "Novice 🚹",
+    "Intermediate 🧠",
+    "Advanced 🧪",
+    "Expert 🢼",
+    "Elite 🧮",
+    "Master 🧙",
+    "Grandmaster 🏆",
+    "Supergrandmaster 🫸",
+    "Legendary �",
+)
+TIER_COLORS = ("38;5;130", "37", "38;5;209", "38;5;225", "38;5;228", "38;5;117", "38;5;201", "38;5;46", "34", "31", "38;5;51")
+
+_TIER_LABELS = tuple(color_text(name, color) for name, color in zip(TIER_NAMES, TIER_COLORS))
+
+# Tier names are matched case-insensitively, with or without their emoji
+_TIER_INDEX_BY_NAME = {
+    key: index
+    for index, name in enumerate(TIER_NAMES)
+    for key in (name.lower(), name.split()[0].lower())
+}
+
+def count_tiers(players_dict):
+    """
+    Returns the number of players in each tier, indexed by tier. main() counts
+    once at startup; adding, removing and re-rating players then keep the counts
+    current, so the rating distribution never has to rescan the players.
+    """
+    tier_counts = [0] * len(TIER_NAMES)
+    for player in players_dict.values():
+        tier_counts[player.tier_index] += 1
+    return tier_counts
+
+def _tier_index(rating):
+    """Returns the index of the tier a rating falls in."""
+    return min(int(rating) // TIER_WIDTH, TOP_TIER_INDEX)
+
 def get_tier(rating):
     """Determines a player's tier based on their rating."""
-    if rating < 500:
-        return color_text("Noob 🐣", "38;5;130")
-    elif rating < 1000:
-        return color_text("Beginner 🧑‍🎓", "37")
-    elif rating < 1500:
-        return color_text("Novice 🚹", "38;5;209")
-    elif rating < 2000:
-        return color_text("Intermediate 🧠", "38;5;225")
-    elif rating < 2500:
-        return color_text("Advanced 🧪", "38;5;228")
-    elif rating < 3000:
-        return color_text("Expert 🢼", "38;5;117")
-    elif rating < 3500:
-        return color_text("Elite 🧮", "38;5;201")
-    elif rating < 4000:
-        return color_text("Master 🧙", "38;5;46")
-    elif rating < 4500:
-        return color_text("Grandmaster 🏆", "34")
-    elif rating < 5000:
-        return color_text("Supergrandmaster 🫸", "31")
-    else:
-        return color_text("Legendary �", "38;5;51")
+    return _TIER_LABELS[_tier_index(rating)]
 
 def get_tier_color_code(rating):
     """Returns the ANSI color code for a player's tier."""
-    if rating < 500:
-        return "38;5;130"
-    elif rating < 1000:
-        return "37"
-    elif rating < 1500:
-        return "38;5;209"
-    elif rating < 2000:
-        return "38;5;225"
-    elif rating < 2500:
-        return "38;5;228"
-    elif rating < 3000:
-        return "38;5;117"
-    elif rating < 3500:
-        return "38;5;201"
-    elif rating < 4000:
-        return "38;5;46"
-    elif rating < 4500:
-        return "34"
-    elif rating < 5000:
-        return "31"
-    else:
-        return "38;5;51"
+    return TIER_COLORS[_tier_index(rating)]
 
 def get_progress_bar(rating):
     """Generates a progress bar for a player's current tier."""
-    tiers = [
-        (1, 499), (500, 999), (1000, 1499), (1500, 1999), (2000, 2499),
-        (2500, 2999), (3000, 3499), (3500, 3999), (4000, 4499), (4500, 4999),
-        (5000, 9999)
-    ]
-    for low, high in tiers:
-        if low <= rating <= high:
-            progress = (rating - low) / (high - low + 1) # Added +1 to avoid division by zero for narrow tiers
-            filled = int(progress * 10)
-            empty = 10 - filled
-            color = get_tier_color_code(rating)
-            bar = "[" + "█" * filled + "░" * empty + "]"
-            return f"\033[{color}m{bar}\033[0m"
-    return "[██████████]"
+    return _get_progress_bar_cached(int(rating))
+
+@functools.lru_cache(maxsize=10000)
+def _get_progress_bar_cached(rating):
+    """Cached progress bar keyed by the integer rating."""
+    index = _tier_index(rating)
+    low = max(1, index * TIER_WIDTH) # Ratings start at 1
+    high = 9999 if index == TOP_TIER_INDEX else index * TIER_WIDTH + TIER_WIDTH - 1
+    progress = (rating - low) / (high - low + 1) # Added +1 to avoid division by zero for narrow tiers
+    filled = int(progress * 10)
+    empty = 10 - filled
+    bar = "[" + "█" * filled + "░" * empty + "]"
+    return f"\033[{TIER_COLORS[index]}m{bar}\033[0m"
+
+def _decorate(rating):
+    """Returns the (tier, level, progress bar) display fields for a rating in one pass."""
+    rating = int(rating)
+    return _TIER_LABELS[_tier_index(rating)], _get_level_cached(rating), _get_progress_bar_cached(rating)
+
+_LN10_OVER_400 = math.log(10) / 400 # 10 ** (d / 400) == exp(d * ln(10) / 400)
 
 def calculate_expected_score(player_a, player_b):
     """Calculates the expected score for player A against player B."""
-    return 1 / (1 + 10 ** ((player_b.rating - player_a.rating) / 400))
+    return 1.0 / (1.0 + math.exp(_LN10_OVER_400 * (player_b.rating - player_a.rating)))
+
+@functools.lru_cache(maxsize=64)
+def _rating_updater(k_factor):
+    """
+    Returns a rating update function for one K-factor, with its rating exponent
+    (K / 50) computed once. K-factors run from 1 to 40, so only a few are built.
+    """
+    exponent = k_factor / 50
 
-def update_ratings(player_a, player_b, result):
+    def update(rating, avg, delta):
+        return max(1, min(9999, rating + avg ** exponent * delta))
+    return update
+
+def update_ratings(player_a, player_b, result, tier_counts):
     expected_a = calculate_expected_score(player_a, player_b)
-    expected_b = calculate_expected_score(player_b, player_a)
+    expected_b = 1.0 - expected_a # Expected scores of both players always sum to 1
 
     avg = (player_a.rating + player_b.rating) / 2
-    adjusted_k_a = player_a.k_factor / 50
-    adjusted_k_b = player_b.k_factor / 50
-    adjust_value_a = avg ** adjusted_k_a
-    adjust_value_b = avg ** adjusted_k_b
-
     old_rating_a = player_a.rating
     old_rating_b = player_b.rating
 
-    player_a.rating += adjust_value_a * (result - expected_a)
-    player_b.rating += adjust_value_b * ((1 - result) - expected_b)
-
-    player_a.rating = max(1, min(9999, player_a.rating))
-    player_b.rating = max(1, min(9999, player_b.rating))
+    set_rating(player_a, _rating_updater(player_a.k_factor)(old_rating_a, avg, result - expected_a), tier_counts)
+    set_rating(player_b, _rating_updater(player_b.k_factor)(old_rating_b, avg, (1 - result) - expected_b), tier_counts)
+    invalidate_leaderboard()
 
     return old_rating_a, old_rating_b, player_a.rating, player_b.rating
 
-def undo_last_match(players_dict, match_history, redo_stack):
+# One rated match: both players' names and their ratings before and after it.
+# The same record moves between match_history and the redo stack unchanged.
+MatchRecord = namedtuple("MatchRecord", ["name_a", "name_b", "old_rating_a", "old_rating_b", "new_rating_a", "new_rating_b"])
+
+def undo_last_match(players_dict, tier_counts, match_history, redo_stack):
     """Undoes the last recorded match, restoring player ratings."""
     if not match_history:
         print("❌ No match to undo.")
         return
 
-    name_a, name_b, old_rating_a, old_rating_b, new_rating_a, new_rating_b = match_history.pop()
+    record = match_history.pop()
+    name_a, name_b = record.name_a, record.name_b
 
     if name_a in players_dict and name_b in players_dict:
-        # The tuple stored in redo_stack is (name_a, name_b, rating_a_after_match, rating_b_after_match, rating_a_before_match, rating_b_before_match)
-        redo_stack.append((name_a, name_b, new_rating_a, new_rating_b, old_rating_a, old_rating_b))
-        players_dict[name_a].rating = old_rating_a
-        players_dict[name_b].rating = old_rating_b
+        redo_stack.append(record)
+        set_rating(players_dict[name_a], record.old_rating_a, tier_counts)
+        set_rating(players_dict[name_b], record.old_rating_b, tier_counts)
+        invalidate_leaderboard()
         print(f"↩️ Undid last match between {name_a} and {name_b}. Ratings restored.")
         safe_beep(700, 200)
     else:
         print("❌ One or both players not found. Cannot undo.")
 
-def redo_last_match(players_dict, redo_stack, match_history):
+def redo_last_match(players_dict, tier_counts, redo_stack, match_history):
     """Redoes the last undone match, reapplying rating changes."""
     if not redo_stack:
         print("❌ No match to redo.")
         return
 
-    # Correctly interpret what's popped from redo_stack
-    # It stores (name_a, name_b, rating_a_after_match, rating_b_after_match, rating_a_before_match, rating_b_before_match)
-    name_a, name_b, rating_a_after_match, rating_b_after_match, rating_a_before_match, rating_b_before_match = redo_stack.pop()
+    record = redo_stack.pop()
+    name_a, name_b = record.name_a, record.name_b
 
     if name_a in players_dict and name_b in players_dict:
-        # Set ratings to the 'after match' values (which were the 'new' ratings before undo)
-        players_dict[name_a].rating = rating_a_after_match
-        players_dict[name_b].rating = rating_b_after_match
+        # Set ratings back to their values after the match
+        set_rating(players_dict[name_a], record.new_rating_a, tier_counts)
+        set_rating(players_dict[name_b], record.new_rating_b, tier_counts)
+        invalidate_leaderboard()
         
-        # Push the original match record back to match_history
-        match_history.append((name_a, name_b, rating_a_before_match, rating_b_before_match, rating_a_after_match, rating_b_after_match))
+        # Push the match record back to match_history
+        match_history.append(record)
         
         print(f"🔁 Redid match between {name_a} and {name_b}. Ratings reapplied.")
         safe_beep(750, 200)
     else:
         print("❌ One or both players not found. Cannot redo.")
 
+# The leaderboard order is kept between views and re-sorted in place. Timsort
+# detects the existing runs, so after a match moves a couple of ratings the
+# re-sort is close to one linear pass instead of a full O(N log N) sort.
+# Until the leaderboard changes, views reuse it as is.
+_ranking = []
+_ranking_dirty = True
+_leaderboard_version = 0 # Bumped on every change, so other leaderboard caches can tell they are stale
+
+def invalidate_leaderboard():
+    """Marks the cached leaderboard as stale after players, names, ratings or K-factors change."""
+    global _ranking_dirty, _leaderboard_version
+    _ranking_dirty = True
+    _leaderboard_version += 1
+
+def _ranked_players(players_dict):
+    """Returns the registered players ordered by rating, highest first."""
+    global _ranking_dirty
+    if not _ranking_dirty:
+        return _ranking
+    _ranking_dirty = False
+    registered = set(map(id, players_dict.values()))
+    _ranking[:] = [player for player in _ranking if id(player) in registered] # Drop removed players
+    if len(_ranking) != len(players_dict):
+        ranked = set(map(id, _ranking))
+        _ranking.extend(player for player in players_dict.values() if id(player) not in ranked)
+    _ranking.sort(key=attrgetter("rating"), reverse=True)
+    return _ranking
+
 def show_leaderboard(players_dict):
     """Prints the current Elo leaderboard."""
     if not players_dict:
         print("No players registered yet.")
         return
 
-    sorted_players = sorted(players_dict.values(), key=lambda p: p.rating, reverse=True)
-    print("\n📊 Elo Leaderboard:")
+    sorted_players = _ranked_players(players_dict)
     safe_beep(1000, 200)
-    for i, player in enumerate(sorted_players, start=1):
-        print(f"{i}. {player}")
+    # Build the whole table and write it once rather than once per row
+    rows = "".join(f"{i}. {player}\n" for i, player in enumerate(sorted_players, start=1))
+    sys.stdout.write(f"\n📊 Elo Leaderboard:\n{rows}")
 
 def export_leaderboard(players_dict, filename="leaderboard.txt"):
     """Exports the leaderboard to a text file."""
     if not players_dict:
         print("No players to export.")
         return
-    sorted_players = sorted(players_dict.values(), key=lambda p: p.rating, reverse=True)
-    with open(filename, "w", encoding='utf-8') as file:
-        file.write("📊 Elo Leaderboard:\n")
-        for i, player in enumerate(sorted_players, start=1):
-            file.write(f"{i}. {str(player)}\n")
+    sorted_players = _ranked_players(players_dict)
+    parts = ["📊 Elo Leaderboard:\n"]
+    for i, player in enumerate(sorted_players, start=1):
+        parts.append(f"{i}. {str(player)}\n")
+    # Build the whole file in memory and hand it over in one write
+    with open(filename, "w", encoding='utf-8', buffering=1 << 20) as file:
+        file.write("".join(parts))
     print(f"📁 Leaderboard exported to {filename}")
     safe_beep(1200, 200)
 
+CSV_BATCH_SIZE = 1000 # Rows handed to the CSV writer per batch in export_leaderboard_csv
+CSV_HEADER = ("Name", "Rating", "Tier", "Level", "K-Factor", "Progress Bar")
+
+def _leaderboard_csv_rows(players_dict):
+    """Yields one CSV row per player, highest rating first."""
+    for player in _ranked_players(players_dict):
+        tier, level, progress = _decorate(player.rating)
+        yield (player.name, round(player.rating), tier, level, player.k_factor, progress)
+
 def export_leaderboard_csv(players_dict):
     """Exports the leaderboard to a CSV file."""
     if not players_dict:
@@ -213,20 +339,26 @@ def export_leaderboard_csv(players_dict):
         return
     timestamp = time.strftime("%Y%m%d-%H%M%S")
     filename = f"leaderboard_{timestamp}.csv"
-    sorted_players = sorted(players_dict.values(), key=lambda p: p.rating, reverse=True)
-    with open(filename, "w", newline='', encoding='utf-8') as file:
+
+    # A 1 MiB buffer lets the OS see a few large writes instead of one per row
+    with open(filename, "w", newline='', encoding='utf-8', buffering=1 << 20) as file:
         writer = csv.writer(file)
-        writer.writerow(["Name", "Rating", "Tier", "Level", "K-Factor", "Progress Bar"])
-        for player in sorted_players:
-            tier = get_tier(player.rating)
-            level = get_level(player.rating)
-            progress = get_progress_bar(player.rating)
-            writer.writerow([player.name, round(player.rating), tier, level, player.k_factor, progress])
+        writer.writerow(CSV_HEADER)
+        player_rows = _leaderboard_csv_rows(players_dict)
+        row_count = 0
+        # Write in batches and only report progress once per full batch
+        while batch := list(islice(player_rows, CSV_BATCH_SIZE)):
+            writer.writerows(batch)
+            row_count += len(batch)
+            if len(batch) == CSV_BATCH_SIZE:
+                print(f"Exporting... {row_count} rows written", end='\r')
     print(f"📁 CSV Leaderboard exported to {filename}")
     safe_beep(1300, 200)
 
 def loading_animation(text="Processing"):
     """Displays a simple loading animation."""
+    if not AI_MOVE_DELAY:
+        return
     for i in range(3):
         print(f"{text}{'.' * (i + 1)}", end='\r')
         time.sleep(0.4)
@@ -239,67 +371,245 @@ def average_rating(players_dict):
     total = sum(player.rating for player in players_dict.values())
     return total / len(players_dict)
 
+# --- Player persistence ---
+# Players are saved as a compact binary pickle of plain values whenever the
+# leaderboard changes, so a session survives restarts without re-writing any
+# text export. The .txt/.csv exports stay on-demand only.
+SAVE_FILE = os.environ.get("TTT_SAVE_FILE", "players.dat")
+_saved_version = None # Leaderboard version last written to SAVE_FILE
+_autosave_enabled = True # Turned off if an unreadable save could not be moved out of the way
+
+def _save_state(players_dict, path=SAVE_FILE):
+    """Writes every player's rating, K-factor and previous names to the save file."""
+    state = {name: (p.rating, p.k_factor, p.old_names) for name, p in players_dict.items()}
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path) # Never leave a half-written save behind
+
+class _PlainUnpickler(pickle.Unpickler):
+    """Unpickler that only rebuilds plain values, so a planted save file cannot run code."""
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"save file refers to {module}.{name}, which is not allowed")
+
+def _valid_entry(name, rating, k_factor, old_names):
+    """Checks a saved player against the same limits add_player enforces."""
+    return (
+        isinstance(name, str)
+        and type(rating) in (int, float) and math.isfinite(rating) and 1 <= rating <= 9999
+        and type(k_factor) is int and 1 <= k_factor <= 40 # type() check so True is not a K-factor
+        and isinstance(old_names, list) and all(isinstance(old_name, str) for old_name in old_names)
+    )
+
+def _load_state(path=SAVE_FILE):
+    """Loads players from the save file, or returns an empty dict if there is none."""
+    global _saved_version, _autosave_enabled
+    players_dict = {}
+    try:
+        with open(path, "rb") as file:
+            state = _PlainUnpickler(file).load()
+        if not isinstance(state, dict):
+            raise ValueError("not a table of players")
+        for name, (rating, k_factor, old_names) in state.items():
+            if not _valid_entry(name, rating, k_factor, old_names):
+                raise ValueError(f"malformed entry for player {name!r}")
+            name = sys.intern(name)
+            players_dict[name] = Player(name, rating, k_factor)
+            players_dict[name].old_names = list(old_names)
+    except FileNotFoundError:
+        pass # First run: nothing saved yet
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, OverflowError) as e:
+        print(f"❌ Could not load saved players from {path}: {e}")
+        players_dict = {}
+        # Keep the unreadable save instead of letting the next autosave overwrite it
+        bad_path = path + ".bad"
+        try:
+            os.replace(path, bad_path)
+            print(f"The unreadable save was moved to {bad_path}.")
+        except OSError:
+            _autosave_enabled = False
+            print("Autosave is off for this session so that file is not overwritten.")
+    invalidate_leaderboard()
+    _saved_version = _leaderboard_version
+    return players_dict
+
+def _autosave(players_dict):
+    """Saves the players if the leaderboard changed since the last save."""
+    global _saved_version
+    if not _autosave_enabled or _saved_version == _leaderboard_version:
+        return
+    try:
+        _save_state(players_dict)
+        _saved_version = _leaderboard_version
+    except OSError as e:
+        print(f"❌ Could not save players to {SAVE_FILE}: {e}")
+
+# --- Leaderboard email ---
+# SMTP settings come from the environment so no credentials live in the code:
+# TTT_SMTP_HOST, TTT_SMTP_PORT (default 587), TTT_SMTP_USER, TTT_SMTP_PASSWORD
+# and optionally TTT_EMAIL_FROM (defaults to the SMTP user).
+_smtp = None # Logged-in SMTP session, reused across sends
+_csv_cache = None # (leaderboard version, CSV bytes) of the last emailed leaderboard
+
+def _smtp_settings():
+    """Returns (host, port, user, password, sender) from the environment, or None if not configured."""
+    host = os.environ.get("TTT_SMTP_HOST")
+    user = os.environ.get("TTT_SMTP_USER")
+    password = os.environ.get("TTT_SMTP_PASSWORD")
+    if not (host and user and password):
+        return None
+    port = parse_int(os.environ.get("TTT_SMTP_PORT", "587"))
+    if port is None or not 1 <= port <= 65535:
+        return None # Reported alongside the missing settings
+    return host, port, user, password, os.environ.get("TTT_EMAIL_FROM", user)
+
+def _close_smtp():
+    """Closes the shared SMTP session, if one is open."""
+    global _smtp
+    if _smtp is not None:
+        try:
+            _smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass # Connection already gone
+        _smtp = None
+
+def _smtp_session(host, port, user, password):
+    """Returns the shared SMTP session, connecting and logging in only when there is no live one."""
+    global _smtp
+    if _smtp is not None:
+        try:
+            _smtp.noop() # Much cheaper than a new TLS handshake and login
+            return _smtp
+        except (smtplib.SMTPException, OSError):
+            _smtp = None # Server dropped the connection; reconnect below
+    session = smtplib.SMTP(host, port, timeout=30)
+    try:
+        session.starttls()
+        session.login(user, password)
+    except BaseException:
+        session.close() # Don't leak the socket of a session that never logged in
+        raise
+    _smtp = session
+    return session
+
+atexit.register(_close_smtp)
+
+def _leaderboard_csv_bytes(players_dict):
+    """Returns the CSV leaderboard as UTF-8 bytes, regenerating them only after the leaderboard changed."""
+    global _csv_cache
+    if _csv_cache is None or _csv_cache[0] != _leaderboard_version:
+        # Encode rows as they are written rather than building the whole CSV as a str first
+        buffer = io.BytesIO()
+        text = io.TextIOWrapper(buffer, encoding="utf-8", newline='')
+        writer = csv.writer(text)
+        writer.writerow(CSV_HEADER)
+        writer.writerows(_leaderboard_csv_rows(players_dict))
+        text.detach() # Flushes into buffer and leaves it open
+        _csv_cache = (_leaderboard_version, buffer.getvalue())
+    return _csv_cache[1]
+
 def email_leaderboard(players_dict, recipient_email):
     """Emails the leaderboard as a CSV attachment."""
-    print("Note: Email functionality requires configuring your email client/server settings.")
-    print("For security, avoid using real credentials directly in code in production environments.")
-    print("This feature might not work depending on your environment's network restrictions and email provider.")
-    
-    # This feature requires a pre-configured SMTP server and app password,
-    # which cannot be done within this sandbox environment.
-    # Therefore, this will likely fail unless executed in a local environment with proper setup.
-    print("Skipping email attempt as it requires external SMTP server configuration.")
-    # You would typically generate the CSV and then attach it like this:
-    # timestamp = time.strftime("%Y%m%d-%H%M%S")
-    # filename = f"leaderboard_{timestamp}.csv"
-    # sorted_players = sorted(players_dict.values(), key=lambda p: p.rating, reverse=True)
-    # with open(filename, "w", newline='', encoding='utf-8') as file:
-    #     writer = csv.writer(file)
-    #     writer.writerow(["Name", "Rating", "Tier", "Progress"])
-    #     for player in sorted_players:
-    #         tier = get_tier(player.rating)
-    #         progress = get_progress_bar(player.rating)
-    #         writer.writerow([player.name, round(player.rating), tier, progress])
-
-    # msg = EmailMessage()
-    # msg['Subject'] = '📊 Elo Leaderboard Export'
-    # msg['From'] = 'your_email@example.com' # <<< REPLACE WITH YOUR SENDER EMAIL
-    # msg['To'] = recipient_email
-    # msg.set_content('Attached is the latest Elo leaderboard.')
-
-    # with open(filename, 'rb') as f:
-    #     file_data = f.read()
-    #     msg.add_attachment(file_data, maintype='text', subtype='csv', filename=filename)
-
-    # try:
-    #     with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp:
-    #         smtp.login('your_email@example.com', 'your_app_password') # <<< REPLACE WITH YOUR EMAIL AND APP PASSWORD
-    #         smtp.send_message(msg)
-    #     print(f"📤 Leaderboard emailed to {recipient_email}")
-    #     safe_beep(1400, 200)
-    # except Exception as e:
-    #     print(f"❌ Failed to send email: {e}")
+    if not players_dict:
+        print("No players to export.")
+        return
+    settings = _smtp_settings()
+    if settings is None:
+        print("Note: Email requires SMTP settings in the environment:")
+        print("TTT_SMTP_HOST, TTT_SMTP_USER and TTT_SMTP_PASSWORD (optionally TTT_SMTP_PORT and TTT_EMAIL_FROM).")
+        print("TTT_SMTP_PORT, if set, must be a port number from 1 to 65535.")
+        print("Skipping email attempt as no SMTP server is configured.")
+        return
+    host, port, user, password, sender = settings
+
+    timestamp = time.strftime("%Y%m%d-%H%M%S")
+    msg = EmailMessage()
+    msg['Subject'] = '📊 Elo Leaderboard Export'
+    msg['From'] = sender
+    msg['To'] = recipient_email
+    msg.set_content('Attached is the latest Elo leaderboard.')
+    msg.add_attachment(_leaderboard_csv_bytes(players_dict), maintype='text', subtype='csv', filename=f"leaderboard_{timestamp}.csv")
+
+    try:
+        _smtp_session(host, port, user, password).send_message(msg)
+        print(f"📤 Leaderboard emailed to {recipient_email}")
+        safe_beep(1400, 200)
+    except (smtplib.SMTPException, OSError) as e:
+        _close_smtp()
+        print(f"❌ Failed to send email: {e}")
+
+HISTORY_LIMIT = 500 # Most undo/redo entries kept per stack; the oldest are dropped first
+
+class MatchLog:
+    """
+    A bounded stack of MatchRecords that also indexes each player's records,
+    so a rename only touches that player's matches.
+    Records are numbered in arrival order; once HISTORY_LIMIT is reached the oldest
+    record is dropped, and _first tracks the number of the oldest record still held.
+    Only the stack operations are exposed, so the index cannot fall out of step.
+    """
+    def __init__(self, maxlen=HISTORY_LIMIT):
+        self._records = deque(maxlen=maxlen)
+        self._positions_by_name = {} # {name: set of record numbers naming that player}
+        self._first = 0
+
+    def __len__(self):
+        return len(self._records)
+
+    def __bool__(self):
+        return bool(self._records)
+
+    def _forget(self, record, number):
+        for name in (record.name_a, record.name_b):
+            numbers = self._positions_by_name.get(name)
+            if numbers is not None:
+                numbers.discard(number)
+                if not numbers:
+                    del self._positions_by_name[name]
+
+    def append(self, record):
+        records = self._records
+        if len(records) == records.maxlen:
+            self._forget(records.popleft(), self._first) # Make room by dropping the oldest record
+            self._first += 1
+        number = self._first + len(records)
+        records.append(record)
+        for name in (record.name_a, record.name_b):
+            self._positions_by_name.setdefault(name, set()).add(number)
+
+    def pop(self):
+        record = self._records.pop()
+        self._forget(record, self._first + len(self._records))
+        return record
+
+    def clear(self):
+        self._records.clear()
+        self._positions_by_name.clear()
+        self._first = 0
+
+    def rename(self, from_name, to_name):
+        """Replaces a player's name in every record that references it."""
+        numbers = self._positions_by_name.pop(from_name, None)
+        if not numbers:
+            return
+        records = self._records
+        for number in numbers:
+            position = number - self._first
+            record = records[position]
+            if record.name_a == from_name:
+                record = record._replace(name_a=to_name)
+            if record.name_b == from_name:
+                record = record._replace(name_b=to_name)
+            records[position] = record
+        self._positions_by_name.setdefault(to_name, set()).update(numbers)
 
 # helper to replace player names inside match history / redo stacks
 def _replace_name_in_match_lists(from_name, to_name, match_history, match_redo):
     """Helper function to update player names in match history records."""
-    def replace_in_list(lst):
-        for idx, rec in enumerate(lst):
-            if len(rec) >= 2:
-                a, b = rec[0], rec[1]
-                changed = False
-                if a == from_name:
-                    a = to_name
-                    changed = True
-                if b == from_name:
-                    b = to_name
-                    changed = True
-                if changed:
-                    lst[idx] = (a, b) + tuple(rec[2:])
-    replace_in_list(match_history)
-    replace_in_list(match_redo)
-
-def rename_player(players_dict, old_name, new_name, rename_history, rename_redo, match_history, match_redo):
+    match_history.rename(from_name, to_name)
+    match_redo.rename(from_name, to_name)
+
+def rename_player(players_dict, lower_names, old_name, new_name, rename_history, rename_redo, match_history, match_redo):
     """Renames a player and updates all associated records."""
     if not old_name or not new_name:
         print("❌ Names cannot be empty.")
@@ -309,14 +619,23 @@ def rename_player(players_dict, old_name, new_name, rename_history, rename_redo,
         print(f"❌ Player '{old_name}' not found.")
         return
 
-    if new_name in players_dict:
+    if new_name == old_name:
         print(f"❌ Player '{new_name}' already exists.")
         return
 
+    # Changing only the case of a player's own name is allowed
+    if lower_names.get(new_name.lower(), old_name) != old_name:
+        print(f"❌ Player '{lower_names[new_name.lower()]}' already exists.")
+        return
+
     # Move player and log old name
+    new_name = sys.intern(new_name)
+    del lower_names[old_name.lower()]
+    lower_names[new_name.lower()] = new_name
     players_dict[new_name] = players_dict.pop(old_name)
     players_dict[new_name].old_names.append(old_name)
     players_dict[new_name].name = new_name
+    invalidate_leaderboard()
 
     # Update stored match history & redo stacks (so undo/redo still works)
     _replace_name_in_match_lists(old_name, new_name, match_history, match_redo)
@@ -327,7 +646,7 @@ def rename_player(players_dict, old_name, new_name, rename_history, rename_redo,
     print(f"✅ Renamed '{old_name}' to '{new_name}'.")
     safe_beep(900, 200)
 
-def undo_rename(players_dict, rename_history, rename_redo, match_history, match_redo):
+def undo_rename(players_dict, lower_names, rename_history, rename_redo, match_history, match_redo):
     """Undoes the last player rename operation."""
     if not rename_history:
         print("❌ No rename to undo.")
@@ -340,10 +659,18 @@ def undo_rename(players_dict, rename_history, rename_redo, match_history, match_
         # put it back just in case
         rename_history.append((old_name, new_name))
         return
+    # the old name may have been given to a new player since
+    if lower_names.get(old_name.lower(), new_name) != new_name:
+        print(f"❌ Cannot undo rename: '{lower_names[old_name.lower()]}' is now taken.")
+        rename_history.append((old_name, new_name))
+        return
 
     # move back
+    del lower_names[new_name.lower()]
+    lower_names[old_name.lower()] = old_name
     players_dict[old_name] = players_dict.pop(new_name)
     players_dict[old_name].name = old_name
+    invalidate_leaderboard()
     # remove the last recorded old name if present
     if players_dict[old_name].old_names:
         # the last appended should be old_name
@@ -363,26 +690,26 @@ def undo_rename(players_dict, rename_history, rename_redo, match_history, match_
 # 🔍 Search players by tier
 def search_players_by_tier(players_dict):
     """Searches and displays players belonging to a specific tier."""
-    tier_input = input("Enter tier name (e.g., 'Expert 🧭'): ").strip()
-    found = [p for p in players_dict.values() if get_tier(p.rating) == tier_input]
+    tier_input = input("Enter tier name (e.g., 'Expert'): ").strip()
+    tier_index = _TIER_INDEX_BY_NAME.get(tier_input.lower())
+    if tier_index is None:
+        print("❌ Unknown tier name.")
+        return
+    found = [p for p in players_dict.values() if p.tier_index == tier_index]
     if not found:
         print("❌ No players found in that tier.")
     else:
-        print(f"\n🎯 Players in {tier_input}:")
+        print(f"\n🎯 Players in {_TIER_LABELS[tier_index]}:")
         for player in found:
             print(player)
 
 # 📈 Show rating distribution
-def show_rating_distribution(players_dict):
+def show_rating_distribution(tier_counts):
     """Displays the distribution of players across different rating tiers."""
-    distribution = {}
-    for player in players_dict.values():
-        tier = get_tier(player.rating)
-        distribution[tier] = distribution.get(tier, 0) + 1
-
-    print("\n📊 Rating Distribution:")
-    for tier, count in sorted(distribution.items(), key=lambda x: x[0]):
-        print(f"{tier}: {count} player(s)")
+    # The counts are maintained as ratings change, so this reads one count per tier
+    # instead of rescanning the players; tiers print in rating order
+    rows = "".join(f"{_TIER_LABELS[index]}: {count} player(s)\n" for index, count in enumerate(tier_counts) if count)
+    sys.stdout.write(f"\n📊 Rating Distribution:\n{rows}")
 
 # ⚔️ Compare two players
 def compare_players(players_dict):
@@ -397,7 +724,7 @@ def compare_players(players_dict):
     p1 = players_dict[name1]
     p2 = players_dict[name2]
     expected1 = calculate_expected_score(p1, p2)
-    expected2 = calculate_expected_score(p2, p1)
+    expected2 = 1.0 - expected1
 
     print(f"\n📊 Comparison:")
     print(f"{p1.name}: {round(p1.rating)} ({get_tier(p1.rating)}, {get_level(p1.rating)})")
@@ -406,49 +733,149 @@ def compare_players(players_dict):
     print(f"  {p1.name}: {round(expected1 * 100, 2)}%")
     print(f"  {p2.name}: {round(expected2 * 100, 2)}%")
 
+# ➕ Add a player
+def add_player(players_dict, tier_counts, lower_names):
+    """Prompts for a new player's name, rating and K-factor and adds them."""
+    # Interned names share one string object with every dict key and record that uses them
+    name = sys.intern(input("Enter player name: ").strip())
+    if name.lower() in lower_names:
+        print("Player already exists.")
+        return
+    rating = parse_bounded_int(input("Enter starting rating (or press Enter for 2500): "), 2500, 1, 9999)
+    k_factor = parse_bounded_int(input("Enter starting K-factor (or press Enter for 20): "), 20, 1, 40)
+    if rating is None or k_factor is None:
+        print("❌ Invalid input. Rating and K-factor must be numbers.")
+        return
+    player = players_dict[name] = Player(name, rating, k_factor)
+    tier_counts[player.tier_index] += 1
+    lower_names[name.lower()] = name
+    invalidate_leaderboard()
+    print(f"{name} added with rating {rating} and K-factor {k_factor}.")
+    safe_beep(600, 200)
+
+# 🔧 Change a player's K-factor
+def change_k_factor(players_dict):
+    """Prompts for a player and sets their K-factor."""
+    name = input("Enter player name to change K-factor: ")
+    if name not in players_dict:
+        print("❌ Player not found.")
+        return
+    new_k = parse_int(input(f"Enter new K-factor for {name} (1-40): "))
+    if new_k is None:
+        print("❌ Invalid number. Try again.")
+    elif 1 <= new_k <= 40:
+        players_dict[name].k_factor = new_k
+        invalidate_leaderboard()
+        print(f"🔧 K-factor for {name} updated to {new_k}.")
+    else:
+        print("❌ K-factor must be between 1 and 40.")
+
+# 🗑️ Remove a player
+def remove_player(players_dict, tier_counts, lower_names):
+    """Prompts for a player and removes them after confirmation."""
+    name = input("Enter the player name to remove: ")
+    if name not in players_dict:
+        print("❌ Player not found.")
+        return
+    if confirm(f"Are you sure you want to remove {name}? This cannot be undone. (yes/no): "):
+        tier_counts[players_dict.pop(name).tier_index] -= 1
+        del lower_names[name.lower()]
+        invalidate_leaderboard()
+        print(f"🗑️ {name} has been removed from the leaderboard.")
+    else:
+        print("Removal cancelled.")
+
+# 📧 Email the leaderboard
+def prompt_email_leaderboard(players_dict):
+    """Prompts for a recipient and emails them the leaderboard."""
+    recipient = input("Enter recipient email: ")
+    email_leaderboard(players_dict, recipient)
+
+# ✏️ Rename a player
+def prompt_rename_player(players_dict, lower_names, rename_history, rename_redo, match_history, match_redo):
+    """Prompts for a player's current and new names and renames them."""
+    old = input("Enter current player name to rename: ").strip()
+    new = input("Enter new name: ").strip()
+    rename_player(players_dict, lower_names, old, new, rename_history, rename_redo, match_history, match_redo)
+
+# 🔢 Numeric input parsing
+def parse_int(text):
+    """Parses a whole number typed by the user, returning None if it is not one."""
+    text = text.strip()
+    digits = text[1:] if text[:1] in ("+", "-") else text
+    # Checking the characters up front avoids raising and catching ValueError for every typo
+    if not digits.isdecimal():
+        return None
+    try:
+        return int(text)
+    except ValueError: # More digits than int() will convert (sys.get_int_max_str_digits)
+        return None
+
+def parse_bounded_int(text, default, low, high):
+    """
+    Parses a whole number typed by the user and clamps it to [low, high].
+    Returns default for blank input and None if the text is not a number.
+    """
+    if not text.strip():
+        return default
+    value = parse_int(text)
+    if value is None:
+        return None
+    return max(low, min(high, value))
+
+# ✅ Yes/no confirmation
+_YES = frozenset(("y", "yes"))
+_NO = frozenset(("n", "no", "")) # Pressing Enter declines
+
+def confirm(prompt):
+    """Asks a yes/no question until the answer is recognised; returns True for yes."""
+    while True:
+        answer = input(prompt).strip().lower()
+        if answer in _YES:
+            return True
+        if answer in _NO:
+            return False
+        print("Please answer 'yes' or 'no'.")
+
 # --- Tic Tac Toe Game Logic (adapted) ---
 
+# Pre-rendered board pieces; each spot is padded to 3 characters: " X ", " O ", or "   "
+_BOARD_BORDER = "=" * 11 # Board is 11 characters wide: 3 spots of 3 plus 2 separators
+_ROW_SEPARATOR = "---+" * 2 + "---"
+_CELL_DISPLAY = {
+    "X": f"{COLOR_RED} X {COLOR_RESET}",
+    "O": f"{COLOR_BLUE} O {COLOR_RESET}",
+    " ": "   ",
+}
+
 def print_board(board):
     """
     Prints the Tic Tac Toe board to the console with colored marks,
     ensuring symmetrical alignment for 11-character width.
     'X' will be red, and 'O' will be blue.
+    The whole board is assembled first and written in a single call.
     """
-    board_width = 11
-
-    print("\n" + "=" * board_width) # Top border
+    parts = ["\n", _BOARD_BORDER, "\n"] # Top border
     for i in range(3):
-        row_display_parts = []
-        for spot in board[i]:
-            # Each spot is padded to 3 characters: " X ", " O ", or "   "
-            if spot == "X":
-                row_display_parts.append(f"{COLOR_RED} {spot} {COLOR_RESET}")
-            elif spot == "O":
-                row_display_parts.append(f"{COLOR_BLUE} {spot} {COLOR_RESET}")
-            else:
-                row_display_parts.append("   ") # Three spaces for empty spot
-        # Join parts with a single "|" to form the row: " X | O |   "
-        print("|".join(row_display_parts))
+        # Join spots with a single "|" to form the row: " X | O |   "
+        parts.append("|".join([_CELL_DISPLAY[spot] for spot in board[i]]))
+        parts.append("\n")
         if i < 2:
-            # Horizontal separator matching the board_width: "---+---+---"
-            print("---+" * 2 + "---")
-    print("=" * board_width + "\n") # Bottom border
+            parts.append(_ROW_SEPARATOR)
+            parts.append("\n")
+    parts.append(_BOARD_BORDER) # Bottom border
+    parts.append("\n\n")
+    sys.stdout.write("".join(parts))
+
+# The 8 winning lines as indices into the flattened 9-square board
+WIN_LINES = ((0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6))
 
 def check_win(board, player):
     """Checks if the given player has won the game."""
-    # Check rows
-    for row in board:
-        if all([s == player for s in row]):
-            return True
-    # Check columns
-    for col in range(3):
-        if all([board[row][col] == player for row in range(3)]):
+    flat = board[0] + board[1] + board[2]
+    for a, b, c in WIN_LINES:
+        if flat[a] == flat[b] == flat[c] == player:
             return True
-    # Check diagonals
-    if all([board[i][i] == player for i in range(3)]):
-        return True
-    if all([board[i][2-i] == player for i in range(3)]):
-        return True
     return False
 
 def check_draw(board):
@@ -459,79 +886,272 @@ def check_draw(board):
                 return False
     return True
 
+# A move is two digits from 1 to 3 separated by whitespace, e.g. "1 2"
+_MOVE_RE = re.compile(r"^\s*([1-3])\s+([1-3])\s*$")
+
 def get_human_move(player_mark):
     """Gets a valid move from the human player."""
     while True:
-        try:
-            move = input(f"Player {player_mark}, enter your move (row, column, e.g., 1 2): ")
-            row, col = map(int, move.split())
-            row -= 1
-            col -= 1
-            if 0 <= row < 3 and 0 <= col < 3:
-                return row, col
-            else:
-                print("Invalid move. Row and column must be between 1 and 3. Try again.")
-        except ValueError:
-            print("Invalid input format. Please enter two numbers separated by a space (e.g., 1 2).")
-        except Exception as e:
-            print(f"An unexpected error occurred: {e}. Please try again.")
-
-
-def minimax(board, depth, is_maximizing_player, maximizing_player_mark, minimizing_player_mark):
+        move = _MOVE_RE.match(input(f"Player {player_mark}, enter your move (row, column, e.g., 1 2): "))
+        if move:
+            return int(move.group(1)) - 1, int(move.group(2)) - 1
+        print("Invalid move. Enter a row and column between 1 and 3 separated by a space (e.g., 1 2). Try again.")
+
+
+# Candidate squares ordered center -> corners -> edges so the strongest moves are
+# searched first, which lets alpha-beta pruning cut off more of the tree.
+MOVE_ORDER = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2), (0, 1), (1, 0), (1, 2), (2, 1)]
+
+# --- Bitmask board representation for search ---
+# Each player's squares are packed into a 9-bit int (bit index = row * 3 + col),
+# so a win test is a handful of AND/compare ops and making a move is an OR.
+_FULL_MASK = 0b111111111
+_MOVE_ORDER_INDICES = tuple(r * 3 + c for r, c in MOVE_ORDER)
+_MOVE_ORDER_BITS = tuple(1 << index for index in _MOVE_ORDER_INDICES)
+
+def _player_mask(board, player):
+    """Packs the squares held by the given player into a 9-bit mask."""
+    mask = 0
+    bit = 1
+    for row in board:
+        for spot in row:
+            if spot == player:
+                mask |= bit
+            bit <<= 1
+    return mask
+
+def _won(mask):
+    """Checks if a player's 9-bit mask contains one of the 8 winning lines (unrolled)."""
+    return (
+        (mask & 0b000000111) == 0b000000111 or
+        (mask & 0b000111000) == 0b000111000 or
+        (mask & 0b111000000) == 0b111000000 or
+        (mask & 0b001001001) == 0b001001001 or
+        (mask & 0b010010010) == 0b010010010 or
+        (mask & 0b100100100) == 0b100100100 or
+        (mask & 0b100010001) == 0b100010001 or
+        (mask & 0b001010100) == 0b001010100
+    )
+
+def _minimax_masks(max_mask, min_mask, is_maximizing_player, alpha, beta):
     """
-    Implements the Minimax algorithm to evaluate the best move.
-    Returns the score for the current board state.
+    Alpha-beta Minimax over the two players' bitmasks. Returns the score for the board.
+    The search runs iteratively on an explicit stack of frames rather than recursing,
+    which avoids a Python function call per node.
     """
-    if check_win(board, maximizing_player_mark):
+    if _won(max_mask):
         return 1
-    if check_win(board, minimizing_player_mark):
+    if _won(min_mask):
         return -1
-    if check_draw(board):
+    if max_mask | min_mask == _FULL_MASK:
         return 0
 
-    if is_maximizing_player:
-        max_eval = -math.inf
-        for r in range(3):
-            for c in range(3):
-                if board[r][c] == " ":
-                    board[r][c] = maximizing_player_mark
-                    eval = minimax(board, depth + 1, False, maximizing_player_mark, minimizing_player_mark)
-                    board[r][c] = " "
-                    max_eval = max(max_eval, eval)
-        return max_eval
-    else:
-        min_eval = math.inf
-        for r in range(3):
-            for c in range(3):
-                if board[r][c] == " ":
-                    board[r][c] = minimizing_player_mark
-                    eval = minimax(board, depth + 1, True, maximizing_player_mark, minimizing_player_mark)
-                    board[r][c] = " "
-                    min_eval = min(min_eval, eval)
-        return min_eval
+    # Each frame is [max_mask, min_mask, is_maximizing_player, next MOVE_ORDER position, best score, alpha, beta]
+    stack = [[max_mask, min_mask, is_maximizing_player, 0, -math.inf if is_maximizing_player else math.inf, alpha, beta]]
+    while True:
+        frame = stack[-1]
+        max_mask, min_mask, is_max, position, best, alpha, beta = frame
+        occupied = max_mask | min_mask
+        child = None
+
+        # Stop trying moves once beta <= alpha: the opponent will never allow this branch
+        while position < 9 and alpha < beta:
+            bit = _MOVE_ORDER_BITS[position]
+            position += 1
+            if occupied & bit:
+                continue
+            # Only the player who just moved can have completed a line
+            if is_max:
+                child_max, child_min = max_mask | bit, min_mask
+                score = 1 if _won(child_max) else None
+            else:
+                child_max, child_min = max_mask, min_mask | bit
+                score = -1 if _won(child_min) else None
+            if score is None:
+                if child_max | child_min == _FULL_MASK:
+                    score = 0
+                else:
+                    child = [child_max, child_min, not is_max, 0, math.inf if is_max else -math.inf, alpha, beta]
+                    break
+            if is_max:
+                best = max(best, score)
+                alpha = max(alpha, score)
+            else:
+                best = min(best, score)
+                beta = min(beta, score)
+
+        if child is not None:
+            frame[3:] = (position, best, alpha, beta) # Resume here once the child is scored
+            stack.append(child)
+            continue
+
+        # All moves tried (or cut off): hand this frame's score to its parent
+        stack.pop()
+        if not stack:
+            return best
+        parent = stack[-1]
+        if parent[2]:
+            parent[4] = max(parent[4], best)
+            parent[5] = max(parent[5], best)
+        else:
+            parent[4] = min(parent[4], best)
+            parent[6] = min(parent[6], best)
 
-def get_ai_move(board, current_ai_player, opponent_player):
-    """Determines the AI's optimal move using the Minimax algorithm."""
+def minimax(board, depth, is_maximizing_player, maximizing_player_mark, minimizing_player_mark, alpha=-math.inf, beta=math.inf):
+    """
+    Implements the Minimax algorithm with alpha-beta pruning to evaluate the best move.
+    Returns the score for the current board state.
+    """
+    max_mask = _player_mask(board, maximizing_player_mark)
+    min_mask = _player_mask(board, minimizing_player_mark)
+    if alpha == -math.inf and beta == math.inf:
+        return _minimax_cached(*_canonical_masks(max_mask, min_mask), is_maximizing_player)
+    return _minimax_masks(max_mask, min_mask, is_maximizing_player, alpha, beta)
+
+# The 8 symmetries of the board (4 rotations x 2 reflections). Each tuple lists,
+# for every square, the square it takes its contents from.
+_SYMMETRIES = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8), # Identity
+    (6, 3, 0, 7, 4, 1, 8, 5, 2), # Rotate 90
+    (8, 7, 6, 5, 4, 3, 2, 1, 0), # Rotate 180
+    (2, 5, 8, 1, 4, 7, 0, 3, 6), # Rotate 270
+    (2, 1, 0, 5, 4, 3, 8, 7, 6), # Mirror left-right
+    (6, 7, 8, 3, 4, 5, 0, 1, 2), # Mirror top-bottom
+    (0, 3, 6, 1, 4, 7, 2, 5, 8), # Mirror across the main diagonal
+    (8, 5, 2, 7, 4, 1, 6, 3, 0), # Mirror across the anti-diagonal
+)
+
+def _symmetry_table(symmetry):
+    """Returns the transformed version of every possible 9-bit mask under one symmetry."""
+    moved_bits = [0] * 9 # moved_bits[source] is the bit that square's contents move to
+    for square, source in enumerate(symmetry):
+        moved_bits[source] = 1 << square
+    table = [0] * (1 << 9)
+    # Each mask is a smaller mask plus its lowest set bit, so one OR per entry
+    for mask in range(1, 1 << 9):
+        low_bit = mask & -mask
+        table[mask] = table[mask ^ low_bit] | moved_bits[low_bit.bit_length() - 1]
+    return tuple(table)
+
+# The symmetries let the table build, which runs at import, search each distinct
+# position once instead of up to 8 times
+_SYMMETRY_MASKS = tuple(_symmetry_table(symmetry) for symmetry in _SYMMETRIES)
+
+def _canonical_masks(max_mask, min_mask):
+    """Returns the smallest (max_mask, min_mask) pair among all symmetric versions of a position."""
+    return min((table[max_mask], table[min_mask]) for table in _SYMMETRY_MASKS)
+
+@functools.lru_cache(maxsize=None)
+def _minimax_cached(max_mask, min_mask, is_maximizing_player):
+    """
+    Memoized full-window Minimax score for a position. The two masks identify the
+    board exactly, so transpositions reached by different move orders (and repeat
+    positions on later turns) cost a single cache lookup. Callers pass canonical
+    masks so that symmetric positions share one entry.
+    """
+    return _minimax_masks(max_mask, min_mask, is_maximizing_player, -math.inf, math.inf)
+
+# --- Perfect-play lookup table ---
+# Every board is encoded as a base-3 integer (empty=0, X=1, O=2, read row by row),
+# giving keys in [0, 3**9). All positions reachable with X moving first are solved
+# once at import, so the AI and the evaluation display become single list lookups.
+_CELL_CODES = {" ": 0, "X": 1, "O": 2}
+_PLACE_VALUES = tuple(3 ** (8 - index) for index in range(9)) # Key weight of each square
+_TABLE_SIZE = 3 ** 9
+_EVAL = [None] * _TABLE_SIZE # Evaluation for the side to move (1 win, 0 draw, -1 loss); None if unreachable
+_BEST_MOVE = [-1] * _TABLE_SIZE # Best square index (row * 3 + col) for the side to move; -1 if none
+
+def encode_board(board):
+    """Encodes the board as a base-3 integer key into the perfect-play table."""
+    key = 0
+    for row in board:
+        for spot in row:
+            key = key * 3 + _CELL_CODES[spot]
+    return key
+
+def _table_key(board, player_to_move):
+    """Returns the table key for the board, or None if the table does not cover this position."""
+    empty_count = sum(row.count(" ") for row in board)
+    # X always starts, so X is to move exactly when an odd number of squares are empty
+    if (player_to_move == "X") != (empty_count % 2 == 1):
+        return None
+    key = encode_board(board)
+    if _EVAL[key] is None:
+        return None
+    return key
+
+def _best_move_masks(mover_mask, waiting_mask):
+    """
+    Returns (score, square index) of the best move for the side to move, using the
+    memoized Minimax search. Ties go to the earliest square in MOVE_ORDER.
+    """
+    occupied = mover_mask | waiting_mask
     best_score = -math.inf
-    best_move = (-1, -1)
+    best_index = -1
+    scored_children = set() # Canonical positions already scored for this position
+
+    for index in _MOVE_ORDER_INDICES:
+        bit = 1 << index
+        if not occupied & bit:
+            child = _canonical_masks(mover_mask | bit, waiting_mask)
+            if child in scored_children:
+                continue # Symmetric to a move already scored, so it cannot be strictly better
+            scored_children.add(child)
+            # Full-window scores are exact, so they can be cached and reused across positions
+            score = _minimax_cached(*child, False)
+
+            if score > best_score:
+                best_score = score
+                best_index = index
+                if score == 1:
+                    break # Nothing beats a win, and ties keep the earlier move anyway
+    return best_score, best_index
+
+def _build_perfect_play_table():
+    """Fills the lookup table for every position reachable from the empty board."""
+    # Each entry is (key, mask of the side to move, mask of the other side, their cell codes)
+    stack = [(0, 0, 0, _CELL_CODES["X"], _CELL_CODES["O"])]
+    while stack:
+        key, mover_mask, waiting_mask, code, opponent_code = stack.pop()
+        if _EVAL[key] is not None:
+            continue # Transposition: already solved via another move order
+        if _won(waiting_mask):
+            _EVAL[key] = -1 # The player who just moved has won
+            continue
+        occupied = mover_mask | waiting_mask
+        if occupied == _FULL_MASK:
+            _EVAL[key] = 0
+            continue
+
+        _EVAL[key], _BEST_MOVE[key] = _best_move_masks(mover_mask, waiting_mask)
+        for index in range(9):
+            bit = 1 << index
+            if not occupied & bit:
+                stack.append((key + code * _PLACE_VALUES[index], waiting_mask, mover_mask | bit, opponent_code, code))
+
+_build_perfect_play_table()
 
-    for r in range(3):
-        for c in range(3):
-            if board[r][c] == " ":
-                board[r][c] = current_ai_player
-                score = minimax(board, 0, False, current_ai_player, opponent_player)
-                board[r][c] = " "
+def get_ai_move(board, current_ai_player, opponent_player):
+    """
+    Determines the AI's optimal move from the perfect-play table.
+    Falls back to a full Minimax search for positions the table does not cover.
+    """
+    key = _table_key(board, current_ai_player)
+    if key is not None and _BEST_MOVE[key] >= 0:
+        return divmod(_BEST_MOVE[key], 3)
 
-                if score > best_score:
-                    best_score = score
-                    best_move = (r, c)
-    return best_move
+    # Pack the board once per AI turn; the search then runs on the two bitmasks
+    best_index = _best_move_masks(_player_mask(board, current_ai_player), _player_mask(board, opponent_player))[1]
+    return divmod(best_index, 3) if best_index >= 0 else (-1, -1)
 
 def get_current_board_evaluation(board, perspective_player, opponent_player):
-    """Returns the Minimax evaluation of the current board state from a specific player's perspective."""
+    """Returns the evaluation of the current board state from a specific player's perspective."""
+    key = _table_key(board, perspective_player)
+    if key is not None:
+        return _EVAL[key]
     return minimax(board, 0, True, perspective_player, opponent_player)
 
-def run_tic_tac_toe_game(players_dict, match_history, redo_stack):
+def run_tic_tac_toe_game(players_dict, tier_counts, match_history, redo_stack):
     """
     Runs a single Tic Tac Toe game session, handling game modes and Elo updates.
     """
@@ -540,18 +1160,16 @@ def run_tic_tac_toe_game(players_dict, match_history, redo_stack):
     current_player_index = 0 # X always starts
 
     print("\n--- Tic Tac Toe Game Modes ---")
-    game_mode = ""
-    while game_mode not in ["1", "2", "3", "4", "5"]:
-        game_mode = input(
+    game_mode_choices = frozenset(("1", "2", "3", "4", "5"))
+    while (game_mode := input(
             "1. Human vs Human (Ranked Elo Match)\n"
             "2. Human vs Human (Unranked)\n"
             "3. Human vs AI\n"
             "4. AI vs AI\n"
             "5. Back to Main Menu\n"
             "Enter your choice: "
-        )
-        if game_mode not in ["1", "2", "3", "4", "5"]:
-            print("Invalid choice. Please enter 1, 2, 3, 4, or 5.")
+        ).strip()) not in game_mode_choices:
+        print("Invalid choice. Please enter 1, 2, 3, 4, or 5.")
     
     if game_mode == "5": # Back to Main Menu
         return
@@ -593,9 +1211,9 @@ def run_tic_tac_toe_game(players_dict, match_history, redo_stack):
         # Display current player's evaluation
         eval_perspective_player = current_board_player_mark
         eval_opponent_player = game_players[(current_player_index + 1) % 2]
-        
-        board_copy_for_eval = [row[:] for row in board]
-        evaluation = get_current_board_evaluation(board_copy_for_eval, eval_perspective_player, eval_opponent_player)
+
+        # The evaluation only reads the board (the search works on bitmasks), so no copy is needed
+        evaluation = get_current_board_evaluation(board, eval_perspective_player, eval_opponent_player)
         
         eval_bar_display = ""
         if evaluation == 1:
@@ -618,7 +1236,8 @@ def run_tic_tac_toe_game(players_dict, match_history, redo_stack):
             else: # AI's turn (O)
                 print(f"Player {current_board_player_mark} (AI)'s turn...")
                 row, col = get_ai_move(board, "O", "X")
-                time.sleep(1)
+                if AI_MOVE_DELAY:
+                    time.sleep(AI_MOVE_DELAY)
         elif game_mode == "4": # AI vs AI
             if current_board_player_mark == "X":
                 print(f"Player {current_board_player_mark} (AI_1)'s turn...")
@@ -626,7 +1245,8 @@ def run_tic_tac_toe_game(players_dict, match_history, redo_stack):
             else:
                 print(f"Player {current_board_player_mark} (AI_2)'s turn...")
                 row, col = get_ai_move(board, "O", "X")
-            time.sleep(1)
+            if AI_MOVE_DELAY:
+                time.sleep(AI_MOVE_DELAY)
 
         # Validate the obtained move
         if not (0 <= row < 3 and 0 <= col < 3 and board[row][col] == " "):
@@ -659,10 +1279,8 @@ def run_tic_tac_toe_game(players_dict, match_history, redo_stack):
                     result = 0
 
                 loading_animation("Updating ratings")
-                old_x, old_o, new_x, new_o = update_ratings(
-                    player_x_obj, player_o_obj, result, player_x_obj.k_factor # Using Player X's K-factor for both
-                )
-                match_history.append((player_x_obj.name, player_o_obj.name, old_x, old_o, new_x, new_o))
+                old_x, old_o, new_x, new_o = update_ratings(player_x_obj, player_o_obj, result, tier_counts)
+                match_history.append(MatchRecord(player_x_obj.name, player_o_obj.name, old_x, old_o, new_x, new_o))
                 redo_stack.clear() # Clear redo stack on new match
                 print(f"\n--- Elo Rating Update ---")
                 print(f"{player_x_obj.name}: {round(old_x)} -> {round(new_x)}")
@@ -675,17 +1293,58 @@ def run_tic_tac_toe_game(players_dict, match_history, redo_stack):
 
 # --- Main Application Loop ---
 
+def _enable_line_editing(players_dict):
+    """Turns on line editing, prompt history and Tab completion of player names, where readline exists."""
+    if readline is None:
+        return
+    matches = []
+
+    def complete(text, state):
+        if state == 0: # First call for this Tab press: collect the candidates once
+            matches[:] = sorted(name for name in players_dict if name.startswith(text))
+        return matches[state] if state < len(matches) else None
+
+    readline.set_completer(complete)
+    readline.set_completer_delims("") # Names may contain spaces, so complete the whole line
+    if "libedit" in (readline.__doc__ or ""): # macOS ships libedit, which has its own binding syntax
+        readline.parse_and_bind("bind ^I rl_complete")
+    else:
+        readline.parse_and_bind("tab: complete")
+
 def main():
     """Main function to run the Tic Tac Toe and Elo Rating system."""
-    players = {} # Dictionary to store Player objects: {name: Player_object}
-    match_history = []
-    redo_stack = []
-    rename_history = []
-    rename_redo = []
+    players = _load_state() # Dictionary to store Player objects: {name: Player_object}
+    tier_counts = count_tiers(players) # Players per tier, kept next to players from here on
+    lower_names = {name.lower(): name for name in players} # For case-insensitive name clash checks
+    _enable_line_editing(players)
+    match_history = MatchLog()
+    redo_stack = MatchLog()
+    rename_history = deque(maxlen=HISTORY_LIMIT)
+    rename_redo = deque(maxlen=HISTORY_LIMIT)
+
+    # Elo menu choice -> action, built once; None returns to the main menu
+    elo_actions = {
+        "1": lambda: add_player(players, tier_counts, lower_names),
+        "2": lambda: show_leaderboard(players),
+        "3": lambda: change_k_factor(players),
+        "4": lambda: remove_player(players, tier_counts, lower_names),
+        "5": lambda: export_leaderboard(players),
+        "6": lambda: export_leaderboard_csv(players),
+        "7": lambda: prompt_email_leaderboard(players),
+        "8": lambda: search_players_by_tier(players),
+        "9": lambda: show_rating_distribution(tier_counts),
+        "10": lambda: compare_players(players),
+        "11": lambda: undo_last_match(players, tier_counts, match_history, redo_stack),
+        "12": lambda: redo_last_match(players, tier_counts, redo_stack, match_history),
+        "13": lambda: prompt_rename_player(players, lower_names, rename_history, rename_redo, match_history, redo_stack),
+        "14": lambda: undo_rename(players, lower_names, rename_history, rename_redo, match_history, redo_stack),
+        "15": None,
+    }
 
     print("Welcome to Tic Tac Toe!")
 
     while True:
+        _autosave(players)
         print("\n--- Main Menu ---")
         print("1. Play Tic Tac Toe")
         print("2. Manage Elo Players")
@@ -694,9 +1353,10 @@ def main():
         choice = input("Enter your choice: ")
 
         if choice == "1":
-            run_tic_tac_toe_game(players, match_history, redo_stack)
+            run_tic_tac_toe_game(players, tier_counts, match_history, redo_stack)
         elif choice == "2":
             while True:
+                _autosave(players)
                 print("\n--- Elo Management Menu ---")
                 print("1. Add Player")
                 print("2. Show Leaderboard") # Was 3
@@ -716,91 +1376,13 @@ def main():
 
                 elo_choice = input("Enter your choice: ")
 
-                if elo_choice == "1":
-                    name = input("Enter player name: ")
-                    if name in players:
-                        print("Player already exists.")
-                        continue
-                    rating_input = input("Enter starting rating (or press Enter for 2500): ")
-                    k_factor_input = input("Enter starting K-factor (or press Enter for 20): ")
-                    try:
-                        rating = int(rating_input) if rating_input else 2500
-                        k_factor = int(k_factor_input) if k_factor_input else 20
-                        rating = max(1, min(9999, rating))
-                        k_factor = max(1, min(40, k_factor))
-                        players[name] = Player(name, rating, k_factor)
-                        print(f"{name} added with rating {rating} and K-factor {k_factor}.")
-                        safe_beep(600, 200)
-                    except ValueError:
-                        print("❌ Invalid input. Rating and K-factor must be numbers.")
-                
-                elif elo_choice == "2": # Now for Show Leaderboard
-                    show_leaderboard(players)
-
-                elif elo_choice == "3": # Now for Change Player's K-factor
-                    name = input("Enter player name to change K-factor: ")
-                    if name not in players:
-                        print("❌ Player not found.")
-                        continue
-                    try:
-                        new_k = int(input(f"Enter new K-factor for {name} (1-40): "))
-                        if 1 <= new_k <= 40:
-                            players[name].k_factor = new_k
-                            print(f"🔧 K-factor for {name} updated to {new_k}.")
-                        else:
-                            print("❌ K-factor must be between 1 and 40.")
-                    except ValueError:
-                        print("❌ Invalid number. Try again.")
-                
-                elif elo_choice == "4": # Now for Remove Player
-                    name = input("Enter the player name to remove: ")
-                    if name in players:
-                        confirm = input(f"Are you sure you want to remove {name}? This cannot be undone. (yes/no): ").lower()
-                        if confirm == 'yes':
-                            del players[name]
-                            print(f"🗑️ {name} has been removed from the leaderboard.")
-                        else:
-                            print("Removal cancelled.")
-                    else:
-                        print("❌ Player not found.")
-
-                elif elo_choice == "5": # Now for Export Leaderboard to File
-                    export_leaderboard(players)
-
-                elif elo_choice == "6": # Now for Export Leaderboard to CSV
-                    export_leaderboard_csv(players)
-
-                elif elo_choice == "7": # Now for Email Leaderboard
-                    recipient = input("Enter recipient email: ")
-                    email_leaderboard(players, recipient)
-
-                elif elo_choice == "8": # Now for Search Players by Tier
-                    search_players_by_tier(players)
-
-                elif elo_choice == "9": # Now for Show Rating Distribution
-                    show_rating_distribution(players)
-
-                elif elo_choice == "10": # Now for Compare Two Players
-                    compare_players(players)
-
-                elif elo_choice == "11": # Now for Undo Last Match
-                    undo_last_match(players, match_history, redo_stack)
-
-                elif elo_choice == "12": # Now for Redo Last Match
-                    redo_last_match(players, redo_stack, match_history)
-
-                elif elo_choice == "13": # Now for Rename Player
-                    old = input("Enter current player name to rename: ").strip()
-                    new = input("Enter new name: ").strip()
-                    rename_player(players, old, new, rename_history, rename_redo, match_history, redo_stack)
-
-                elif elo_choice == "14": # Now for Undo Rename Player
-                    undo_rename(players, rename_history, rename_redo, match_history, redo_stack)
-                
-                elif elo_choice == "15": # Now for Back to Main Menu
-                    break # Back to Main Menu
-                else:
+                if elo_choice not in elo_actions:
                     print("❌ Invalid choice. Try again.")
+                    continue
+                action = elo_actions[elo_choice]
+                if action is None: # Back to Main Menu
+                    break
+                action()
 
         elif choice == "3":
             print("👋 Thanks for playing! Goodbye!")